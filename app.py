@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import joblib
+import os
 import pickle
-import plotly.graph_objects as go
+import textwrap
+from types import SimpleNamespace
+
+from kernels import FOREST_LAYOUT_VERSION, rf_predict, stack_forest, zone_indices
 
 st.set_page_config(
     page_title="Calorie Burn Predictor | Medical Grade Analytics",
@@ -25,7 +30,10 @@ MEDICAL_COLORS = {
 }
 
 # Custom CSS - Medical Theme
-st.markdown(f"""
+@st.cache_resource
+def build_css():
+    """Format the medical theme stylesheet once per process"""
+    return f"""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
@@ -150,78 +158,308 @@ st.markdown(f"""
         font-weight: 500;
     }}
     </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(build_css(), unsafe_allow_html=True)
+
+# Templates for the constant metric cards, filled once by metric_cards_html
+_MAE_CARD_TMPL = """
+    <div class="intensity-card" style="text-align: center;">
+        <div style="color: {text_secondary}; font-size: 0.9rem; margin-bottom: 0.5rem;">
+            Mean Absolute Error
+        </div>
+        <div style="color: {primary}; font-size: 3rem; font-weight: 700;">
+            {mae}
+        </div>
+        <div style="color: {text_secondary}; font-size: 0.9rem;">
+            calories per prediction
+        </div>
+    </div>
+"""
+
+_R2_CARD_TMPL = """
+    <div class="intensity-card" style="text-align: center;">
+        <div style="color: {text_secondary}; font-size: 0.9rem; margin-bottom: 0.5rem;">
+            R² Score (Accuracy)
+        </div>
+        <div style="color: {success}; font-size: 3rem; font-weight: 700;">
+            {r2}
+        </div>
+        <div style="color: {text_secondary}; font-size: 0.9rem;">
+            {r2_pct}% variance explained
+        </div>
+    </div>
+"""
+
+_FOOTER_TMPL = """
+    <div style='text-align: center; color: {text_secondary}; padding: 1rem 0;'>
+        <p style='margin: 0.25rem 0;'>🏥 <strong>Medical-Grade Analytics Platform</strong></p>
+        <p style='margin: 0.25rem 0; font-size: 0.85rem;'>Random Forest ML | MAE: {mae} cal | R²: {r2} | Accuracy: {r2_pct}%</p>
+        <p style='margin: 0.25rem 0; font-size: 0.75rem;'>⚕️ For educational and research purposes only</p>
+    </div>
+"""
+
+MODEL_PATH = 'calories_model.pkl'
+# Tree arrays unpacked from MODEL_PATH, memory-mapped so workers share pages;
+# the layout version in the name makes a stack_forest change rebuild the file
+FOREST_PATH = f'calories_forest.v{FOREST_LAYOUT_VERSION}.joblib'
 
 # Load model and metrics
 @st.cache_resource
 def load_model():
-    with open('calories_model.pkl', 'rb') as f:
-        model = pickle.load(f)
+    if os.path.exists(FOREST_PATH) and os.path.getmtime(FOREST_PATH) >= os.path.getmtime(MODEL_PATH):
+        forest = joblib.load(FOREST_PATH, mmap_mode='r')
+    else:
+        with open(MODEL_PATH, 'rb') as f:
+            model = pickle.load(f)
+        forest = stack_forest(model)
+        # Caching to disk is best effort; read-only checkouts keep the arrays in memory
+        tmp_path = f"{FOREST_PATH}.{os.getpid()}.tmp"
+        try:
+            joblib.dump(forest, tmp_path)
+            os.replace(tmp_path, FOREST_PATH)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        else:
+            forest = joblib.load(FOREST_PATH, mmap_mode='r')
     with open('metrics.pkl', 'rb') as f:
         metrics = pickle.load(f)
-    return model, metrics
+    return forest, metrics
+
+@st.cache_resource
+def formatted_metrics(m):
+    """Format the model metrics once for every place they are displayed"""
+    return SimpleNamespace(
+        r2=f"{m['r2']:.4f}",
+        r2_pct=f"{m['r2']*100:.2f}",
+        mae=f"{m['mae']:.2f}"
+    )
+
+def join_md(*chunks):
+    """Join markdown/HTML chunks into one body, dedenting each chunk"""
+    return "\n\n".join(textwrap.dedent(chunk).strip() for chunk in chunks)
+
+def md(*chunks):
+    """Render several markdown/HTML chunks in a single st.markdown call"""
+    st.markdown(join_md(*chunks), unsafe_allow_html=True)
+
+def load_plotly():
+    """Import Plotly on first use, serializing figures with orjson
+
+    Chart code should get `go` from here instead of importing Plotly directly,
+    so the orjson engine setting is always applied.
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    pio.json.config.default_engine = 'orjson'
+    return go
 
 def calculate_max_heart_rate(age):
     """Calculate maximum heart rate based on age"""
     return 220 - age
 
+def compute_bmi(weight, height):
+    """Calculate body mass index from weight (kg) and height (cm)"""
+    return weight / ((height/100) ** 2)
+
+def classify_bmi(weight, height):
+    """Classify BMI for weight (kg) and height (cm)"""
+    bmi = compute_bmi(weight, height)
+    return "Normal" if 18.5 <= bmi <= 24.9 else ("Underweight" if bmi < 18.5 else "Overweight")
+
+# Intensity zone shown for each index returned by zone_indices
+_HR_ZONES = (
+    {
+        'zone': 'Rest',
+        'level': 'Very Light',
+        'color': '#94A3B8',
+        'description': 'Recovery and rest',
+        'range': '< 50%'
+    },
+    {
+        'zone': 'Zone 1',
+        'level': 'Light',
+        'color': '#10B981',
+        'description': 'Warm-up and recovery',
+        'range': '50-60%'
+    },
+    {
+        'zone': 'Zone 2',
+        'level': 'Moderate',
+        'color': '#3B82F6',
+        'description': 'Fat burning and endurance',
+        'range': '60-70%'
+    },
+    {
+        'zone': 'Zone 3',
+        'level': 'Vigorous',
+        'color': '#F59E0B',
+        'description': 'Aerobic capacity building',
+        'range': '70-80%'
+    },
+    {
+        'zone': 'Zone 4',
+        'level': 'Hard',
+        'color': '#EF4444',
+        'description': 'Anaerobic threshold',
+        'range': '80-90%'
+    },
+    {
+        'zone': 'Zone 5',
+        'level': 'Maximum',
+        'color': '#DC2626',
+        'description': 'Maximum effort',
+        'range': '90-100%'
+    }
+)
+
 def get_intensity_zone(heart_rate, max_hr):
     """Determine workout intensity zone based on heart rate percentage"""
-    hr_percentage = (heart_rate / max_hr) * 100
-    
-    if hr_percentage < 50:
-        return {
-            'zone': 'Rest',
-            'level': 'Very Light',
-            'color': '#94A3B8',
-            'description': 'Recovery and rest',
-            'range': '< 50%'
-        }
-    elif hr_percentage < 60:
-        return {
-            'zone': 'Zone 1',
-            'level': 'Light',
-            'color': '#10B981',
-            'description': 'Warm-up and recovery',
-            'range': '50-60%'
-        }
-    elif hr_percentage < 70:
-        return {
-            'zone': 'Zone 2',
-            'level': 'Moderate',
-            'color': '#3B82F6',
-            'description': 'Fat burning and endurance',
-            'range': '60-70%'
-        }
-    elif hr_percentage < 80:
-        return {
-            'zone': 'Zone 3',
-            'level': 'Vigorous',
-            'color': '#F59E0B',
-            'description': 'Aerobic capacity building',
-            'range': '70-80%'
-        }
-    elif hr_percentage < 90:
-        return {
-            'zone': 'Zone 4',
-            'level': 'Hard',
-            'color': '#EF4444',
-            'description': 'Anaerobic threshold',
-            'range': '80-90%'
-        }
-    else:
-        return {
-            'zone': 'Zone 5',
-            'level': 'Maximum',
-            'color': '#DC2626',
-            'description': 'Maximum effort',
-            'range': '90-100%'
-        }
+    return _HR_ZONES[zone_indices(np.array([heart_rate]), max_hr)[0]]
+
+forest, metrics = load_model()
+fm = formatted_metrics(metrics)
+
+@st.cache_data(max_entries=512)
+def predict_calories(gender_encoded, age, height, weight, duration, heart_rate, body_temp):
+    """Predict calories burned, memoized on the workout inputs"""
+    input_data = np.array(
+        [gender_encoded, age, height, weight, duration, heart_rate, body_temp],
+        dtype=np.float32
+    )
+    return rf_predict(input_data, *forest)
+
+@st.cache_data(max_entries=512)
+def build_breakdown(gender, age, height, weight, duration, heart_rate, hr_percentage, body_temp):
+    """Format the detailed breakdown for a set of workout inputs as a markdown table"""
+    rows = [
+        ('Gender', gender, '✓'),
+        ('Age', f"{age} years", '✓'),
+        ('Height', f"{height} cm", '✓'),
+        ('Weight', f"{weight} kg", '✓'),
+        ('Duration', f"{duration} min", '✓'),
+        ('Heart Rate', f"{heart_rate} bpm ({hr_percentage:.1f}% max)", '✓'),
+        ('Body Temperature', f"{body_temp}°C", '✓')
+    ]
+    lines = ["| Parameter | Value | Status |", "| --- | --- | :---: |"]
+    lines += [f"| {parameter} | {value} | {status} |" for parameter, value, status in rows]
+    return "\n".join(lines)
+
+@st.cache_data
+def build_zones_table():
+    """Build the static heart rate zones reference table"""
+    return pd.DataFrame({
+        'Zone': ['Zone 1', 'Zone 2', 'Zone 3', 'Zone 4', 'Zone 5'],
+        'Intensity': ['Light', 'Moderate', 'Vigorous', 'Hard', 'Maximum'],
+        'HR % of Max': ['50-60%', '60-70%', '70-80%', '80-90%', '90-100%'],
+        'Primary Benefit': [
+            'Warm-up & Recovery',
+            'Fat Burning & Endurance',
+            'Aerobic Capacity',
+            'Anaerobic Threshold',
+            'Maximum Performance'
+        ],
+        'Cal/Min': ['5-7', '7-10', '10-13', '13-16', '16+']
+    })
 
-model, metrics = load_model()
+@st.cache_data
+def sidebar_html(r2_pct, mae):
+    """Format the sidebar's model metrics and algorithm details"""
+    return join_md("### 📊 System Information",
+        f"""
+            <div class="metric-card">
+                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.85rem; margin-bottom: 0.5rem;">MODEL ACCURACY</div>
+                <div style="color: {MEDICAL_COLORS['primary']}; font-size: 2rem; font-weight: 700;">{r2_pct}%</div>
+            </div>
+        """,
+        f"""
+            <div class="metric-card">
+                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.85rem; margin-bottom: 0.5rem;">MEAN ABSOLUTE ERROR</div>
+                <div style="color: {MEDICAL_COLORS['success']}; font-size: 2rem; font-weight: 700;">±{mae}</div>
+                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.75rem;">calories</div>
+            </div>
+        """,
+        "---",
+        "### 🔬 Algorithm Details",
+        """
+            <div class="info-box" style ="color: #3B82F6">
+                <strong>Model:</strong> Random Forest Regressor<br>
+                <strong>Features:</strong> 7 physiological parameters<br>
+                <strong>Training:</strong> 80/20 split<br>
+                <strong>Status:</strong> <span style='color: #10B981;'>● Production Ready</span>
+            </div>
+        """,
+        "### 📋 Input Parameters",
+        """
+        - Gender & Age
+        - Height & Weight
+        - Exercise Duration
+        - Heart Rate (bpm)
+        - Body Temperature (°C)
+        """)
+
+@st.cache_data
+def metric_cards_html(r2, r2_pct, mae):
+    """Format the Performance Metrics cards and footer from the model metrics"""
+    fields = dict(MEDICAL_COLORS, r2=r2, r2_pct=r2_pct, mae=mae)
+    return (
+        _MAE_CARD_TMPL.format_map(fields),
+        _R2_CARD_TMPL.format_map(fields),
+        _FOOTER_TMPL.format_map(fields)
+    )
+
+@st.cache_resource
+def zone_cards_html():
+    """Format the static Heart Rate Zones guidance cards for both columns once"""
+    left = join_md(f"""
+            <div class="intensity-card">
+                <div style="color: {MEDICAL_COLORS['primary']}; font-weight: 600; margin-bottom: 1rem;">
+                    💡 Zone 1-2: Fat Burning
+                </div>
+                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
+                    Ideal for weight loss and building aerobic base. Body primarily uses fat as fuel. 
+                    Sustainable for long durations (30-60+ minutes)[web:68].
+                </div>
+            </div>
+            """,
+            f"""
+            <div class="intensity-card">
+                <div style="color: {MEDICAL_COLORS['warning']}; font-weight: 600; margin-bottom: 1rem;">
+                    ⚡ Zone 3-4: Performance Training
+                </div>
+                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
+                    Improves cardiovascular fitness and lactate threshold. Carbohydrates become primary 
+                    fuel source. Suitable for 20-40 minute intervals[web:68].
+                </div>
+            </div>
+            """)
+    right = join_md(f"""
+            <div class="intensity-card">
+                <div style="color: {MEDICAL_COLORS['danger']}; font-weight: 600; margin-bottom: 1rem;">
+                    🔥 Zone 5: Maximum Effort
+                </div>
+                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
+                    Highest calorie burn rate (>10 cal/min). Develops speed and power. Only sustainable 
+                    for short bursts (1-5 minutes). Reserved for advanced athletes[web:68].
+                </div>
+            </div>
+            """,
+            f"""
+            <div class="intensity-card">
+                <div style="color: {MEDICAL_COLORS['success']}; font-weight: 600; margin-bottom: 1rem;">
+                    📈 Training Recommendations
+                </div>
+                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
+                    Balanced training should include 70-80% time in Zones 1-2, 15-20% in Zones 3-4, 
+                    and 5-10% in Zone 5 for optimal results[web:22][web:68].
+                </div>
+            </div>
+            """)
+    return left, right
 
 # Header
-st.markdown(f"""
+st.markdown("""
     <div class="main-header">
         <h1 class="main-title">🏥 Medical-Grade Calorie Burn Predictor</h1>
         <p class="subtitle">Advanced ML Analytics for Workout Performance Assessment</p>
@@ -230,51 +468,17 @@ st.markdown(f"""
 
 # Sidebar
 with st.sidebar:
-    st.markdown("### 📊 System Information")
-    
-    st.markdown(f"""
-        <div class="metric-card">
-            <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.85rem; margin-bottom: 0.5rem;">MODEL ACCURACY</div>
-            <div style="color: {MEDICAL_COLORS['primary']}; font-size: 2rem; font-weight: 700;">{metrics['r2']*100:.2f}%</div>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown(f"""
-        <div class="metric-card">
-            <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.85rem; margin-bottom: 0.5rem;">MEAN ABSOLUTE ERROR</div>
-            <div style="color: {MEDICAL_COLORS['success']}; font-size: 2rem; font-weight: 700;">±{metrics['mae']:.2f}</div>
-            <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.75rem;">calories</div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(sidebar_html(fm.r2_pct, fm.mae), unsafe_allow_html=True)
     
-    st.markdown("---")
-    
-    st.markdown("### 🔬 Algorithm Details")
-    st.markdown("""
-        <div class="info-box" style ="color: #3B82F6">
-            <strong>Model:</strong> Random Forest Regressor<br>
-            <strong>Features:</strong> 7 physiological parameters<br>
-            <strong>Training:</strong> 80/20 split<br>
-            <strong>Status:</strong> <span style='color: #10B981;'>● Production Ready</span>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("### 📋 Input Parameters")
-    st.markdown("""
-    - Gender & Age
-    - Height & Weight
-    - Exercise Duration
-    - Heart Rate (bpm)
-    - Body Temperature (°C)
-    """)
+    st.toggle("🎈 Celebrate results", key='celebrate', help="Show balloons after each analysis")
     
     st.markdown("---")
     st.caption("⚕️ For educational purposes only")
 
-# Main tabs
-tab1, tab2, tab3, tab4 = st.tabs(["🎯 Analysis", "📊 Performance Metrics", "💡 About", "❓ Heart Rate Zones"])
-
-with tab1:
+# Analysis inputs and results rerun on their own, without the rest of the page
+@st.fragment
+def analysis_fragment():
+    """Render workout inputs, prediction and intensity analysis"""
     st.markdown('<p class="section-header" style ="color: #3B82F6">Patient & Workout Data Input</p>', unsafe_allow_html=True)
     
     col1, col2 = st.columns(2)
@@ -363,27 +567,20 @@ with tab1:
     if predict_btn:
         # Prepare input
         gender_encoded = 1 if gender == 'Male' else 0
-        input_data = pd.DataFrame({
-            'Gender': [gender_encoded],
-            'Age': [age],
-            'Height': [height],
-            'Weight': [weight],
-            'Duration': [duration],
-            'Heart_Rate': [heart_rate],
-            'Body_Temp': [body_temp]
-        })
         
-        # Make prediction
-        prediction = model.predict(input_data)[0]
+        # Make prediction; the spinner only shows if it runs past st.spinner's
+        # delay, e.g. while Numba compiles rf_predict on first use
+        with st.spinner('Analyzing workout...'):
+            prediction = predict_calories(gender_encoded, age, height, weight, duration, heart_rate, body_temp)
         cal_per_min = prediction / duration
         
         # Get intensity zone
         intensity_info = get_intensity_zone(heart_rate, max_hr)
         
-        st.balloons()
+        if st.session_state.get('celebrate', False):
+            st.balloons()
         
-        st.markdown("---")
-        st.markdown('<p class="section-header">🔬 Analysis Results</p>', unsafe_allow_html=True)
+        md("---", '<p class="section-header">🔬 Analysis Results</p>')
         
         # Main result
         result_col1, result_col2, result_col3 = st.columns([1, 2, 1])
@@ -407,14 +604,12 @@ with tab1:
         with metric_col3:
             st.metric("🔥 Burn Rate", f"{cal_per_min:.2f} cal/min")
         with metric_col4:
-            bmi = weight / ((height/100) ** 2)
-            bmi_status = "Normal" if 18.5 <= bmi <= 24.9 else ("Underweight" if bmi < 18.5 else "Overweight")
+            bmi = compute_bmi(weight, height)
+            bmi_status = classify_bmi(weight, height)
             st.metric("📊 BMI", f"{bmi:.1f}", delta=bmi_status)
         
-        st.markdown("<br>", unsafe_allow_html=True)
-        
         # Intensity Analysis
-        st.markdown('<p class="section-header">💡 Workout Intensity Analysis</p>', unsafe_allow_html=True)
+        md("<br>", '<p class="section-header">💡 Workout Intensity Analysis</p>')
         
         col1, col2 = st.columns([2, 1])
         
@@ -478,23 +673,17 @@ with tab1:
             """, unsafe_allow_html=True)
         
         # Detailed breakdown
-        st.markdown('<p class="section-header">📈 Detailed Breakdown</p>', unsafe_allow_html=True)
-        
-        breakdown_data = pd.DataFrame({
-            'Parameter': ['Gender', 'Age', 'Height', 'Weight', 'Duration', 'Heart Rate', 'Body Temperature'],
-            'Value': [
-                gender,
-                f"{age} years",
-                f"{height} cm",
-                f"{weight} kg",
-                f"{duration} min",
-                f"{heart_rate} bpm ({hr_percentage:.1f}% max)",
-                f"{body_temp}°C"
-            ],
-            'Status': ['✓', '✓', '✓', '✓', '✓', '✓', '✓']
-        })
-        
-        st.dataframe(breakdown_data, use_container_width=True, hide_index=True)
+        md('<p class="section-header">📈 Detailed Breakdown</p>',
+           build_breakdown(gender, age, height, weight, duration, heart_rate, hr_percentage, body_temp))
+
+# Performance Metrics cards and footer, formatted once from the metrics
+mae_card, r2_card, footer_card = metric_cards_html(fm.r2, fm.r2_pct, fm.mae)
+
+# Main tabs
+tab1, tab2, tab3, tab4 = st.tabs(["🎯 Analysis", "📊 Performance Metrics", "💡 About", "❓ Heart Rate Zones"])
+
+with tab1:
+    analysis_fragment()
 
 with tab2:
     st.markdown('<p class="section-header" style ="color: #3B82F6">📊 Model Performance Analysis</p>', unsafe_allow_html=True)
@@ -502,42 +691,18 @@ with tab2:
     perf_col1, perf_col2 = st.columns(2)
     
     with perf_col1:
-        st.markdown(f"""
-            <div class="intensity-card" style="text-align: center;">
-                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem; margin-bottom: 0.5rem;">
-                    Mean Absolute Error
-                </div>
-                <div style="color: {MEDICAL_COLORS['primary']}; font-size: 3rem; font-weight: 700;">
-                    {metrics['mae']:.2f}
-                </div>
-                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
-                    calories per prediction
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(mae_card, unsafe_allow_html=True)
     
     with perf_col2:
-        st.markdown(f"""
-            <div class="intensity-card" style="text-align: center;">
-                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem; margin-bottom: 0.5rem;">
-                    R² Score (Accuracy)
-                </div>
-                <div style="color: {MEDICAL_COLORS['success']}; font-size: 3rem; font-weight: 700;">
-                    {metrics['r2']:.4f}
-                </div>
-                <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
-                    {metrics['r2']*100:.2f}% variance explained
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(r2_card, unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
     st.success(f"""
     🎉 **Clinical-Grade Performance**
     
-    This Random Forest model demonstrates exceptional predictive accuracy with an R² score of {metrics['r2']:.4f}, 
-    explaining {metrics['r2']*100:.2f}% of variance in calorie expenditure. The mean absolute error of only {metrics['mae']:.2f} 
+    This Random Forest model demonstrates exceptional predictive accuracy with an R² score of {fm.r2}, 
+    explaining {fm.r2_pct}% of variance in calorie expenditure. The mean absolute error of only {fm.mae} 
     calories indicates medical-grade precision suitable for fitness and health applications.
     """)
     
@@ -564,9 +729,8 @@ with tab2:
         """)
 
 with tab3:
-    st.markdown('<p class="section-header" style ="color: #3B82F6">ℹ️ System Overview</p>', unsafe_allow_html=True)
-    
-    st.markdown("""
+    md('<p class="section-header" style ="color: #3B82F6">ℹ️ System Overview</p>',
+    """
     ### 🏥 Medical-Grade Calorie Prediction System
     
     This application utilizes advanced machine learning algorithms to provide accurate calorie expenditure 
@@ -614,28 +778,15 @@ with tab3:
     """)
 
 with tab4:
-    st.markdown('<p class="section-header">💓 Heart Rate Zones Explained</p>', unsafe_allow_html=True)
-    
-    st.markdown(f"""
+    md('<p class="section-header">💓 Heart Rate Zones Explained</p>',
+    """
     Heart rate training zones are calculated as percentages of your maximum heart rate (MHR), 
     which is estimated as **220 - age**. Each zone targets specific physiological adaptations 
     and training goals[web:22][web:68].
     """)
     
     # Heart Rate Zones Table
-    zones_data = pd.DataFrame({
-        'Zone': ['Zone 1', 'Zone 2', 'Zone 3', 'Zone 4', 'Zone 5'],
-        'Intensity': ['Light', 'Moderate', 'Vigorous', 'Hard', 'Maximum'],
-        'HR % of Max': ['50-60%', '60-70%', '70-80%', '80-90%', '90-100%'],
-        'Primary Benefit': [
-            'Warm-up & Recovery',
-            'Fat Burning & Endurance',
-            'Aerobic Capacity',
-            'Anaerobic Threshold',
-            'Maximum Performance'
-        ],
-        'Cal/Min': ['5-7', '7-10', '10-13', '13-16', '16+']
-    })
+    zones_data = build_zones_table()
     
     st.dataframe(zones_data, use_container_width=True, hide_index=True)
     
@@ -643,62 +794,14 @@ with tab4:
     
     col1, col2 = st.columns(2)
     
+    left_cards, right_cards = zone_cards_html()
+    
     with col1:
-        st.markdown(f"""
-        <div class="intensity-card">
-            <div style="color: {MEDICAL_COLORS['primary']}; font-weight: 600; margin-bottom: 1rem;">
-                💡 Zone 1-2: Fat Burning
-            </div>
-            <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
-                Ideal for weight loss and building aerobic base. Body primarily uses fat as fuel. 
-                Sustainable for long durations (30-60+ minutes)[web:68].
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class="intensity-card">
-            <div style="color: {MEDICAL_COLORS['warning']}; font-weight: 600; margin-bottom: 1rem;">
-                ⚡ Zone 3-4: Performance Training
-            </div>
-            <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
-                Improves cardiovascular fitness and lactate threshold. Carbohydrates become primary 
-                fuel source. Suitable for 20-40 minute intervals[web:68].
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(left_cards, unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div class="intensity-card">
-            <div style="color: {MEDICAL_COLORS['danger']}; font-weight: 600; margin-bottom: 1rem;">
-                🔥 Zone 5: Maximum Effort
-            </div>
-            <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
-                Highest calorie burn rate (>10 cal/min). Develops speed and power. Only sustainable 
-                for short bursts (1-5 minutes). Reserved for advanced athletes[web:68].
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"""
-        <div class="intensity-card">
-            <div style="color: {MEDICAL_COLORS['success']}; font-weight: 600; margin-bottom: 1rem;">
-                📈 Training Recommendations
-            </div>
-            <div style="color: {MEDICAL_COLORS['text_secondary']}; font-size: 0.9rem;">
-                Balanced training should include 70-80% time in Zones 1-2, 15-20% in Zones 3-4, 
-                and 5-10% in Zone 5 for optimal results[web:22][web:68].
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(right_cards, unsafe_allow_html=True)
 
 # Footer
-st.markdown("---")
-st.markdown(f"""
-    <div style='text-align: center; color: {MEDICAL_COLORS['text_secondary']}; padding: 1rem 0;'>
-        <p style='margin: 0.25rem 0;'>🏥 <strong>Medical-Grade Analytics Platform</strong></p>
-        <p style='margin: 0.25rem 0; font-size: 0.85rem;'>Random Forest ML | MAE: {metrics['mae']:.2f} cal | R²: {metrics['r2']:.4f} | Accuracy: {metrics['r2']*100:.2f}%</p>
-        <p style='margin: 0.25rem 0; font-size: 0.75rem;'>⚕️ For educational and research purposes only</p>
-    </div>
-""", unsafe_allow_html=True)
+md("---", footer_card)
+
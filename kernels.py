@@ -0,0 +1,87 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# Numba-compiled helpers for app.py. They live in their own module so they
+# are compiled once per process instead of on every Streamlit rerun. Without
+# Numba the same arrays are walked with vectorized NumPy instead.
+
+# Bump whenever stack_forest changes its output (dtypes, array order or count)
+FOREST_LAYOUT_VERSION = 1
+
+def stack_forest(model):
+    """Pack each tree's node arrays into padded (n_trees, max_nodes) arrays"""
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    shape = (len(trees), max(tree.node_count for tree in trees))
+
+    features = np.zeros(shape, dtype=np.int32)
+    thresholds = np.zeros(shape, dtype=np.float64)
+    left = np.full(shape, -1, dtype=np.int32)
+    right = np.full(shape, -1, dtype=np.int32)
+    leaf = np.zeros(shape, dtype=np.float32)
+
+    for e, tree in enumerate(trees):
+        n = tree.node_count
+        features[e, :n] = tree.feature
+        thresholds[e, :n] = tree.threshold
+        left[e, :n] = tree.children_left
+        right[e, :n] = tree.children_right
+        leaf[e, :n] = tree.value[:, 0, 0]
+
+    return features, thresholds, left, right, leaf
+
+def rf_predict_numpy(x, features, thresholds, left, right, leaf):
+    """Walk every tree one level at a time with NumPy fancy indexing"""
+    trees = np.arange(features.shape[0])
+    node = np.zeros(features.shape[0], dtype=np.intp)
+    while True:
+        child_left = left[trees, node]
+        split = child_left != -1
+        if not split.any():
+            break
+        go_left = x[features[trees, node]] <= thresholds[trees, node]
+        child = np.where(go_left, child_left, right[trees, node])
+        node = np.where(split, child, node)
+    return leaf[trees, node].mean(dtype=np.float64)
+
+# Heart rate zone boundaries as % of max HR; index 0 is Rest, 5 is Zone 5
+HR_ZONE_BREAKS = np.array([50.0, 60.0, 70.0, 80.0, 90.0])
+
+def zone_indices_numpy(hrs, max_hr):
+    """Map each heart rate sample to its intensity zone index"""
+    return np.searchsorted(HR_ZONE_BREAKS, (hrs / max_hr) * 100, side='right').astype(np.int8)
+
+if HAVE_NUMBA:
+    @njit(cache=True, nogil=True)
+    def rf_predict(x, features, thresholds, left, right, leaf):
+        """Average the leaf value reached in every tree for a single input row"""
+        n_trees = features.shape[0]
+        total = 0.0
+        for e in range(n_trees):
+            node = 0
+            while left[e, node] != -1:
+                if x[features[e, node]] <= thresholds[e, node]:
+                    node = left[e, node]
+                else:
+                    node = right[e, node]
+            total += leaf[e, node]
+        return total / n_trees
+
+    @njit(cache=True)
+    def zone_indices(hrs, max_hr):
+        """Map each heart rate sample to its intensity zone index"""
+        out = np.empty(hrs.shape[0], np.int8)
+        for i in range(hrs.shape[0]):
+            p = (hrs[i] / max_hr) * 100
+            zone = 0
+            while zone < HR_ZONE_BREAKS.shape[0] and p >= HR_ZONE_BREAKS[zone]:
+                zone += 1
+            out[i] = zone
+        return out
+else:
+    rf_predict = rf_predict_numpy
+    zone_indices = zone_indices_numpy